@@ -4,18 +4,73 @@
 # Modified by Vladimir Iglovikov 2019.
 
 import copy
-import struct
+import math
 from abc import ABC, abstractmethod
-from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, List, Dict
 
 import cv2
 import numpy as np
 from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
 from pyquaternion import Quaternion
 
-from lyft_dataset_sdk.utils.geometry_utils import view_points, transform_matrix
+from lyft_dataset_sdk.utils.geometry_utils import view_points
+
+
+def _quaternion_rotation_matrix(rotation: Tuple[float]) -> np.ndarray:
+    """Returns the rotation matrix of a quaternion without constructing a pyquaternion.Quaternion.
+
+    Args:
+        rotation: Rotation in quaternions (w ri rj rk). It does not have to be normalized.
+
+    Returns: <np.float: 3, 3>. Rotation matrix.
+
+    """
+    norm = math.sqrt(sum(value * value for value in rotation))
+    w, x, y, z = (value / norm for value in rotation)
+    return np.array(
+        [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+            [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+            [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+        ]
+    )
+
+
+@lru_cache(maxsize=4096)
+def _cached_transform_matrix(translation: Tuple[float], rotation: Tuple[float], inverse: bool) -> np.ndarray:
+    """Cached version of geometry_utils.transform_matrix(). The returned matrix is shared, so it is read-only."""
+    rotation_matrix = _quaternion_rotation_matrix(rotation)
+    tm = np.eye(4)
+
+    if inverse:
+        tm[:3, :3] = rotation_matrix.T
+        tm[:3, 3] = -np.dot(rotation_matrix.T, translation)
+    else:
+        tm[:3, :3] = rotation_matrix
+        tm[:3, 3] = translation
+
+    tm.flags.writeable = False
+    return tm
+
+
+def _record_transform_matrix(record: Dict, inverse: bool) -> np.ndarray:
+    """Returns the transformation matrix of an ego_pose or calibrated_sensor record.
+
+    Consecutive samples share most of their sweeps and all sweeps of a sensor share the same calibration, so the
+    matrices are cached instead of being rebuilt from the quaternion every time.
+
+    Args:
+        record: The ego_pose or calibrated_sensor record.
+        inverse: Whether to compute inverse transform matrix.
+
+    Returns: <np.float: 4, 4>. Read-only transformation matrix.
+
+    """
+    return _cached_transform_matrix(tuple(record["translation"]), tuple(record["rotation"]), inverse)
 
 
 class PointCloud(ABC):
@@ -27,6 +82,9 @@ class PointCloud(ABC):
     - All other dimensions are optional. Hence these have to be manually modified if the reference frame changes.
     """
 
+    # Class-level settings, see from_file_multisweep().
+    num_loading_workers = 8  # type: int
+
     def __init__(self, points: np.ndarray):
         """Initialize a point cloud and check it has the correct dimensions.
 
@@ -76,11 +134,6 @@ class PointCloud(ABC):
 
         """
 
-        # Init
-        points = np.zeros((cls.nbr_dims(), 0))
-        all_pc = cls(points)
-        all_times = np.zeros((1, 0))
-
         # Get reference pose and timestamp
         ref_sd_token = sample_rec["data"][ref_chan]
         ref_sd_rec = lyftd.get("sample_data", ref_sd_token)
@@ -89,50 +142,65 @@ class PointCloud(ABC):
         ref_time = 1e-6 * ref_sd_rec["timestamp"]
 
         # Homogeneous transform from ego car frame to reference frame
-        ref_from_car = transform_matrix(ref_cs_rec["translation"], Quaternion(ref_cs_rec["rotation"]), inverse=True)
+        ref_from_car = _record_transform_matrix(ref_cs_rec, inverse=True)
 
         # Homogeneous transformation matrix from global to _current_ ego car frame
-        car_from_global = transform_matrix(
-            ref_pose_rec["translation"], Quaternion(ref_pose_rec["rotation"]), inverse=True
-        )
+        car_from_global = _record_transform_matrix(ref_pose_rec, inverse=True)
 
-        # Aggregate current and previous sweeps.
+        # The reference part of the transformation chain is the same for every sweep.
+        ref_from_global = np.dot(ref_from_car, car_from_global)
+
+        # Collect the current and previous sweeps.
         sample_data_token = sample_rec["data"][chan]
         current_sd_rec = lyftd.get("sample_data", sample_data_token)
+        sd_recs = []
         for _ in range(num_sweeps):
-            # Load up the pointcloud.
-            current_pc = cls.from_file(lyftd.data_path / current_sd_rec["filename"])
+            sd_recs.append(current_sd_rec)
 
+            # Abort if there are no previous sweeps.
+            if current_sd_rec["prev"] == "":
+                break
+            else:
+                current_sd_rec = lyftd.get("sample_data", current_sd_rec["prev"])
+
+        # Load up the pointclouds. Reading the files is I/O bound, so the sweeps are loaded concurrently.
+        with ThreadPoolExecutor(max_workers=cls.num_loading_workers) as executor:
+            pcs = list(executor.map(lambda sd_rec: cls.from_file(lyftd.data_path / sd_rec["filename"]), sd_recs))
+
+        # Aggregate current and previous sweeps.
+        pc_chunks = []
+        time_lags = []
+        sweep_nbr_points = []
+        for current_sd_rec, current_pc in zip(sd_recs, pcs):
             # Get past pose.
             current_pose_rec = lyftd.get("ego_pose", current_sd_rec["ego_pose_token"])
-            global_from_car = transform_matrix(
-                current_pose_rec["translation"], Quaternion(current_pose_rec["rotation"]), inverse=False
-            )
+            global_from_car = _record_transform_matrix(current_pose_rec, inverse=False)
 
             # Homogeneous transformation matrix from sensor coordinate frame to ego car frame.
             current_cs_rec = lyftd.get("calibrated_sensor", current_sd_rec["calibrated_sensor_token"])
-            car_from_current = transform_matrix(
-                current_cs_rec["translation"], Quaternion(current_cs_rec["rotation"]), inverse=False
-            )
+            car_from_current = _record_transform_matrix(current_cs_rec, inverse=False)
 
-            # Fuse four transformation matrices into one and perform transform.
-            trans_matrix = reduce(np.dot, [ref_from_car, car_from_global, global_from_car, car_from_current])
-            current_pc.transform(trans_matrix)
+            # Fuse four transformation matrices into one and perform transform. The matrices are fused in double
+            # precision, the transform itself is done in the precision of the points (float32 for lidar).
+            trans_matrix = np.dot(ref_from_global, np.dot(global_from_car, car_from_current))
+            current_pc.transform(trans_matrix.astype(current_pc.points.dtype))
 
-            # Remove close points and add timevector.
+            # Remove close points.
             current_pc.remove_close(min_distance)
-            time_lag = ref_time - 1e-6 * current_sd_rec["timestamp"]  # positive difference
-            times = time_lag * np.ones((1, current_pc.nbr_points()))
-            all_times = np.hstack((all_times, times))
 
-            # Merge with key pc.
-            all_pc.points = np.hstack((all_pc.points, current_pc.points))
+            # Merge with key pc and keep the time lag of the sweep.
+            pc_chunks.append(current_pc.points)
+            time_lags.append(ref_time - 1e-6 * current_sd_rec["timestamp"])  # positive difference
+            sweep_nbr_points.append(current_pc.nbr_points())
 
-            # Abort if there are no previous sweeps.
-            if current_sd_rec["prev"] == "":
-                break
-            else:
-                current_sd_rec = lyftd.get("sample_data", current_sd_rec["prev"])
+        # Concatenate all sweeps at once rather than growing the arrays sweep by sweep.
+        if pc_chunks:
+            all_pc = cls(np.concatenate(pc_chunks, axis=1))
+        else:
+            all_pc = cls(np.zeros((cls.nbr_dims(), 0)))
+
+        # Create the timevector of all sweeps at once.
+        all_times = np.repeat(np.array(time_lags, dtype=np.float64), sweep_nbr_points)[np.newaxis, :]
 
         return all_pc, all_times
 
@@ -159,10 +227,9 @@ class PointCloud(ABC):
         Returns:
 
         """
-        x_filt = np.abs(self.points[0, :]) < radius
-        y_filt = np.abs(self.points[1, :]) < radius
-        not_close = np.logical_not(np.logical_and(x_filt, y_filt))
-        self.points = self.points[:, not_close]
+        close = np.abs(self.points[0, :]) < radius
+        close &= np.abs(self.points[1, :]) < radius
+        self.points = self.points.compress(~close, axis=1)
 
     def translate(self, x: np.ndarray) -> None:
         """Applies a translation to the point cloud.
@@ -171,8 +238,7 @@ class PointCloud(ABC):
             x: <np.float: 3, 1>. Translation in x, y, z.
 
         """
-        for i in range(3):
-            self.points[i, :] = self.points[i, :] + x[i]
+        self.points[:3, :] += np.asarray(x, dtype=self.points.dtype).reshape(3, 1)
 
     def rotate(self, rot_matrix: np.ndarray) -> None:
         """Applies a rotation.
@@ -192,7 +258,10 @@ class PointCloud(ABC):
             transf_matrix: transf_matrix: <np.float: 4, 4>. Homogenous transformation matrix.
 
         """
-        self.points[:3, :] = transf_matrix.dot(np.vstack((self.points[:3, :], np.ones(self.nbr_points()))))[:3, :]
+        # Apply rotation and translation separately to avoid padding the points to homogeneous coordinates.
+        points = np.dot(transf_matrix[:3, :3], self.points[:3, :])
+        points += transf_matrix[:3, 3:4]
+        self.points[:3, :] = points
 
     def render_height(
         self,
@@ -279,9 +348,17 @@ class LidarPointCloud(PointCloud):
 
         assert file_name.suffix == ".bin", "Unsupported filetype {}".format(file_name)
 
-        scan = np.fromfile(str(file_name), dtype=np.float32)
+        # Map the file instead of reading it into an intermediate buffer, the points are copied out of it below.
+        # np.memmap cannot map empty files or files with a trailing partial float, these are read as before.
+        file_size = file_name.stat().st_size
+        if file_size > 0 and file_size % np.dtype(np.float32).itemsize == 0:
+            scan = np.memmap(str(file_name), dtype=np.float32, mode="r")
+        else:
+            scan = np.fromfile(str(file_name), dtype=np.float32)
         points = scan.reshape((-1, 5))[:, : cls.nbr_dims()]
-        return cls(points.T)
+
+        # Store the points contiguously, so that operations on the rows (x, y, z, intensity) are not strided.
+        return cls(np.array(points.T, order="C"))
 
 
 class RadarPointCloud(PointCloud):
@@ -299,6 +376,28 @@ class RadarPointCloud(PointCloud):
         """
         return 18
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _pcd_dtype(field_names: Tuple[str], sizes: Tuple[str], types: Tuple[str]) -> np.dtype:
+        """Returns the structured dtype of a point in a binary Point Cloud Data file.
+        All radar files share the same header, so the dtype is only built once.
+
+        Args:
+            field_names: Names of the fields from the FIELDS header row.
+            sizes: Sizes of the fields in bytes from the SIZE header row.
+            types: Types of the fields from the TYPE header row.
+
+        Returns: Structured numpy dtype.
+
+        """
+        # Lookup table for how to decode the binaries.
+        unpacking_lut = {
+            "F": {2: "<f2", 4: "<f4", 8: "<f8"},
+            "I": {1: "<i1", 2: "<i2", 4: "<i4", 8: "<i8"},
+            "U": {1: "<u1", 2: "<u2", 4: "<u4", 8: "<u8"},
+        }
+        return np.dtype(list(zip(field_names, [unpacking_lut[t][int(s)] for t, s in zip(types, sizes)])))
+
     @classmethod
     def from_file(
         cls,
@@ -395,77 +494,57 @@ class RadarPointCloud(PointCloud):
 
         assert file_name.suffix == ".pcd", "Unsupported filetype {}".format(file_name)
 
-        meta = []
+        # Parse the header into a dict of keyword to values.
+        header = {}
         with open(str(file_name), "rb") as f:
             for line in f:
                 line = line.strip().decode("utf-8")
-                meta.append(line)
-                if line.startswith("DATA"):
+                if not line or line.startswith("#"):
+                    continue
+                key, *values = line.split()
+                header[key] = values
+                if key == "DATA":
                     break
 
             data_binary = f.read()
 
         # Get the header rows and check if they appear as expected.
-        assert meta[0].startswith("#"), "First line must be comment"
-        assert meta[1].startswith("VERSION"), "Second line must be VERSION"
-        sizes = meta[3].split(" ")[1:]
-        types = meta[4].split(" ")[1:]
-        counts = meta[5].split(" ")[1:]
-        width = int(meta[6].split(" ")[1])
-        height = int(meta[7].split(" ")[1])
-        data = meta[10].split(" ")[1]
+        assert "VERSION" in header, "Header must contain VERSION"
+        field_names = header["FIELDS"]
+        sizes = header["SIZE"]
+        types = header["TYPE"]
+        counts = header["COUNT"]
+        width = int(header["WIDTH"][0])
+        height = int(header["HEIGHT"][0])
+        data = header["DATA"][0]
         feature_count = len(types)
         assert width > 0
         assert len([c for c in counts if c != c]) == 0, "Error: COUNT not supported!"
         assert height == 1, "Error: height != 0 not supported!"
         assert data == "binary"
 
-        # Lookup table for how to decode the binaries.
-        unpacking_lut = {
-            "F": {2: "e", 4: "f", 8: "d"},
-            "I": {1: "b", 2: "h", 4: "i", 8: "q"},
-            "U": {1: "B", 2: "H", 4: "I", 8: "Q"},
-        }
-        types_str = "".join([unpacking_lut[t][int(s)] for t, s in zip(types, sizes)])
-
-        # Decode each point.
-        offset = 0
+        # Decode all points at once as a structured array and convert to a numpy matrix.
         point_count = width
-        points = []
-        for i in range(point_count):
-            point = []
-            for p in range(feature_count):
-                start_p = offset
-                end_p = start_p + int(sizes[p])
-                assert end_p < len(data_binary)
-                point_p = struct.unpack(types_str[p], data_binary[start_p:end_p])[0]
-                point.append(point_p)
-                offset = end_p
-            points.append(point)
-
-        # A NaN in the first point indicates an empty pointcloud.
-        point = np.array(points[0])
-        if np.any(np.isnan(point)):
+        dtype = cls._pcd_dtype(tuple(field_names), tuple(sizes), tuple(types))
+        decoded = np.frombuffer(data_binary, dtype=dtype, count=point_count)
+
+        # A NaN in the first point indicates an empty pointcloud. Only the first point is read for this check.
+        if np.any(np.isnan(np.array(decoded[0].item(), dtype=np.float64))):
             return cls(np.zeros((feature_count, 0)))
 
-        # Convert to numpy matrix.
-        points = np.array(points).transpose()
+        points = np.empty((feature_count, point_count))
+        for i, name in enumerate(dtype.names):
+            points[i, :] = decoded[name]
 
         # If no parameters are provided, use default settings.
         invalid_states = cls.invalid_states if invalid_states is None else invalid_states
         dynprop_states = cls.dynprop_states if dynprop_states is None else dynprop_states
         ambig_states = cls.ambig_states if ambig_states is None else ambig_states
 
-        # Filter points with an invalid state.
-        valid = [p in invalid_states for p in points[-4, :]]
-        points = points[:, valid]
-
-        # Filter by dynProp.
-        valid = [p in dynprop_states for p in points[3, :]]
-        points = points[:, valid]
-
-        # Filter by ambig_state.
-        valid = [p in ambig_states for p in points[11, :]]
+        # Filter points by invalid_state, dynProp and ambig_state in a single pass.
+        valid = np.isin(points[-4, :], np.asarray(list(invalid_states)))
+        valid &= np.isin(points[3, :], np.asarray(list(dynprop_states)))
+        valid &= np.isin(points[11, :], np.asarray(list(ambig_states)))
         points = points[:, valid]
 
         return cls(points)
@@ -474,6 +553,14 @@ class RadarPointCloud(PointCloud):
 class Box:
     """Simple data class representing a 3d box including, label, score and velocity."""
 
+    # Corners of a box with unit half-size. (Convention: x points forward, y to the left, z up.)
+    _UNIT_CORNERS = np.array(
+        [[1, 1, 1, 1, -1, -1, -1, -1], [1, -1, -1, 1, 1, -1, -1, 1], [1, 1, -1, -1, 1, 1, -1, -1]], dtype=np.float64
+    )
+
+    # Pairs of corner indices of the box edges: the sides, the front rectangle and the rear rectangle.
+    _EDGES = np.array([[0, 4], [1, 5], [2, 6], [3, 7], [3, 0], [0, 1], [1, 2], [2, 3], [7, 4], [4, 5], [5, 6], [6, 7]])
+
     def __init__(
         self,
         center: (List[float], Tuple[float]),
@@ -497,10 +584,20 @@ class Box:
             name: Box name, optional. Can be used e.g. for denote category name.
             token: Unique string identifier from DB.
         """
-        if np.any(np.isnan(center)):
+        # Convert once and check the converted arrays: NaN is the only value that is not equal to itself. Values that
+        # numpy can not treat as numbers, such as None or strings, are rejected.
+        center = np.array(center)
+        if center.dtype.kind not in "biufc":
+            raise TypeError("Center coordinates should be numbers but we got {}".format(center))
+
+        size = np.array(size)
+        if size.dtype.kind not in "biufc":
+            raise TypeError("Size values should be numbers but we got {}".format(size))
+
+        if (center != center).any():
             raise ValueError("Center coordinates should not have NaN values but we got {}".format(center))
 
-        if np.any(np.isnan(size)):
+        if (size != size).any():
             raise ValueError("Size values should not have NaN values but we got {}".format(size))
 
         if len(center) != 3:
@@ -512,14 +609,15 @@ class Box:
         if not isinstance(orientation, Quaternion):
             raise TypeError("The orientation should be a Quaternion but we got {}".format(type(orientation)))
 
-        self.center = np.array(center)
-        self.wlh = np.array(size)
+        self.center = center
+        self.wlh = size
         self.orientation = orientation
         self.label = int(label) if not np.isnan(label) else label
         self.score = float(score) if not np.isnan(score) else score
         self.velocity = np.array(velocity)
         self.name = name
         self.token = token
+        self._corners_cache = None
 
     def __eq__(self, other) -> bool:
         center = np.allclose(self.center, other.center)
@@ -580,6 +678,7 @@ class Box:
 
         """
         self.center += x
+        self._corners_cache = None
 
         return self
 
@@ -602,6 +701,7 @@ class Box:
         self.center = np.dot(rotation_matrix, self.center)
         self.orientation = quaternion * self.orientation
         self.velocity = np.dot(rotation_matrix, self.velocity)
+        self._corners_cache = None
 
         return self
 
@@ -616,6 +716,7 @@ class Box:
         """
         self.orientation = quaternion * self.orientation
         self.velocity = np.dot(quaternion.rotation_matrix, self.velocity)
+        self._corners_cache = None
 
         return self
 
@@ -629,25 +730,21 @@ class Box:
                 The last four are the ones facing backwards.
 
         """
+        # Corners are cached as they are requested repeatedly when rendering. The key guards against the box
+        # attributes being modified directly.
+        key = (wlh_factor, self.center.tobytes(), self.wlh.tobytes(), self.orientation.q.tobytes())
+        if self._corners_cache is not None and self._corners_cache[0] == key:
+            return self._corners_cache[1].copy()
 
-        width, length, height = self.wlh * wlh_factor
-
-        # 3D bounding box corners. (Convention: x points forward, y to the left, z up.)
-        x_corners = length / 2 * np.array([1, 1, 1, 1, -1, -1, -1, -1])
-        y_corners = width / 2 * np.array([1, -1, -1, 1, 1, -1, -1, 1])
-        z_corners = height / 2 * np.array([1, 1, -1, -1, 1, 1, -1, -1])
-        corners = np.vstack((x_corners, y_corners, z_corners))
+        # 3D bounding box corners, scaled by half of length, width and height.
+        corners = Box._UNIT_CORNERS * (self.wlh[[1, 0, 2]] * wlh_factor / 2).reshape(3, 1)
 
-        # Rotate
-        corners = np.dot(self.orientation.rotation_matrix, corners)
+        # Rotate and translate
+        corners = np.dot(self.orientation.rotation_matrix, corners) + self.center.reshape(3, 1)
 
-        # Translate
-        x, y, z = self.center
-        corners[0, :] = corners[0, :] + x
-        corners[1, :] = corners[1, :] + y
-        corners[2, :] = corners[2, :] + z
+        self._corners_cache = (key, corners)
 
-        return corners
+        return corners.copy()
 
     def bottom_corners(self) -> np.ndarray:
         """Returns the four bottom corners.
@@ -676,36 +773,16 @@ class Box:
             linewidth: Width in pixel of the box sides.
 
         """
-        corners = view_points(self.corners(), view, normalize=normalize)[:2, :]
+        corners = view_points(self.corners(), view, normalize=normalize)[:2, :].T
+        center_bottom_forward = np.mean(corners[2:4], axis=0)
+        center_bottom = np.mean(corners[[2, 3, 7, 6]], axis=0)
 
-        def draw_rect(selected_corners, color):
-            prev = selected_corners[-1]
-            for corner in selected_corners:
-                axis.plot([prev[0], corner[0]], [prev[1], corner[1]], color=color, linewidth=linewidth)
-                prev = corner
-
-        # Draw the sides
-        for i in range(4):
-            axis.plot(
-                [corners.T[i][0], corners.T[i + 4][0]],
-                [corners.T[i][1], corners.T[i + 4][1]],
-                color=colors[2],
-                linewidth=linewidth,
-            )
-
-        # Draw front (first 4 corners) and rear (last 4 corners) rectangles(3d)/lines(2d)
-        draw_rect(corners.T[:4], colors[0])
-        draw_rect(corners.T[4:], colors[1])
-
-        # Draw line indicating the front
-        center_bottom_forward = np.mean(corners.T[2:4], axis=0)
-        center_bottom = np.mean(corners.T[[2, 3, 7, 6]], axis=0)
-        axis.plot(
-            [center_bottom[0], center_bottom_forward[0]],
-            [center_bottom[1], center_bottom_forward[1]],
-            color=colors[0],
-            linewidth=linewidth,
-        )
+        # Draw the sides, front (first 4 corners) and rear (last 4 corners) rectangles(3d)/lines(2d) and the line
+        # indicating the front as a single collection.
+        segments = np.concatenate((corners[Box._EDGES], [[center_bottom, center_bottom_forward]]))
+        edge_colors = [colors[2]] * 4 + [colors[0]] * 4 + [colors[1]] * 4 + [colors[0]]
+        axis.add_collection(LineCollection(segments, colors=edge_colors, linewidths=linewidth))
+        axis.autoscale_view()
 
     def render_cv2(
         self,
@@ -727,38 +804,22 @@ class Box:
         Returns:
 
         """
-        corners = view_points(self.corners(), view, normalize=normalize)[:2, :]
+        corners = view_points(self.corners(), view, normalize=normalize)[:2, :].T
+        center_bottom_forward = np.mean(corners[2:4], axis=0)
+        center_bottom = np.mean(corners[[2, 3, 7, 6]], axis=0)
 
-        def draw_rect(selected_corners, color):
-            prev = selected_corners[-1]
-            for corner in selected_corners:
-                cv2.line(image, (int(prev[0]), int(prev[1])), (int(corner[0]), int(corner[1])), color, linewidth)
-                prev = corner
+        edges = list(corners[Box._EDGES].astype(np.int32))
+        front_line = np.array([center_bottom, center_bottom_forward]).astype(np.int32)
 
         # Draw the sides
-        for i in range(4):
-            cv2.line(
-                image,
-                (int(corners.T[i][0]), int(corners.T[i][1])),
-                (int(corners.T[i + 4][0]), int(corners.T[i + 4][1])),
-                colors[2][::-1],
-                linewidth,
-            )
+        cv2.polylines(image, edges[:4], False, colors[2][::-1], linewidth)
 
         # Draw front (first 4 corners) and rear (last 4 corners) rectangles(3d)/lines(2d)
-        draw_rect(corners.T[:4], colors[0][::-1])
-        draw_rect(corners.T[4:], colors[1][::-1])
+        cv2.polylines(image, edges[4:8], False, colors[0][::-1], linewidth)
+        cv2.polylines(image, edges[8:], False, colors[1][::-1], linewidth)
 
         # Draw line indicating the front
-        center_bottom_forward = np.mean(corners.T[2:4], axis=0)
-        center_bottom = np.mean(corners.T[[2, 3, 7, 6]], axis=0)
-        cv2.line(
-            image,
-            (int(center_bottom[0]), int(center_bottom[1])),
-            (int(center_bottom_forward[0]), int(center_bottom_forward[1])),
-            colors[0][::-1],
-            linewidth,
-        )
+        cv2.polylines(image, [front_line], False, colors[0][::-1], linewidth)
 
     def copy(self) -> "Box":
         """        Create a copy of self.
@@ -46,15 +46,11 @@ def view_points(points: np.ndarray, view: np.ndarray, normalize: bool) -> np.nda
     viewpad = np.eye(4)
     viewpad[: view.shape[0], : view.shape[1]] = view
 
-    nbr_points = points.shape[1]
-
-    # Do operation in homogenous coordinates
-    points = np.concatenate((points, np.ones((1, nbr_points))))
-    points = np.dot(viewpad, points)
-    points = points[:3, :]
+    # Equivalent to the operation in homogenous coordinates, without padding the points with a row of ones.
+    points = np.dot(viewpad[:3, :3], points) + viewpad[:3, 3:4]
 
     if normalize:
-        points = points / points[2:3, :].repeat(3, 0).reshape(3, nbr_points)
+        points /= points[2:3, :]
 
     return points
 
@@ -1,12 +1,19 @@
 import math
+import struct
 
+import cv2
 import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
 from hypothesis import given
 from hypothesis import strategies as st
 from hypothesis.extra.numpy import arrays
 from pyquaternion import Quaternion
 
-from lyft_dataset_sdk.utils.data_classes import Box
+from lyft_dataset_sdk.utils.data_classes import Box, LidarPointCloud, RadarPointCloud, _cached_transform_matrix
+from lyft_dataset_sdk.utils.geometry_utils import transform_matrix, view_points
 
 pi = math.pi
 
@@ -92,3 +99,345 @@ def test_rotate_around_origin_xy(size, angle1, angle2, center):
     target = Box(center=new_center, size=size, orientation=new_orientation)
 
     assert original.rotate_around_origin(q2) == target
+
+
+def test_box_nan():
+    for value in ([1.0, np.nan, 0.0], (np.nan, 1.0, 1.0), np.array([1.0, 1.0, np.nan])):
+        with pytest.raises(ValueError):
+            Box(center=value, size=[1.0, 1.0, 1.0], orientation=Quaternion())
+
+        with pytest.raises(ValueError):
+            Box(center=[0.0, 0.0, 0.0], size=value, orientation=Quaternion())
+
+
+def test_box_not_numeric():
+    for value in ([1.0, None, 2.0], ("1", 2.0, 3.0)):
+        with pytest.raises(TypeError):
+            Box(center=value, size=[1.0, 1.0, 1.0], orientation=Quaternion())
+
+        with pytest.raises(TypeError):
+            Box(center=[0.0, 0.0, 0.0], size=value, orientation=Quaternion())
+
+    # Integer arrays and 0-d array elements are accepted, and the box keeps its own copy of them.
+    center = np.array([1, 2, 3], dtype=np.int64)
+    box = Box(center=center, size=[np.array(1.0), np.float32(2.0), 3], orientation=Quaternion())
+    np.testing.assert_array_equal(box.center, [1, 2, 3])
+    np.testing.assert_array_equal(box.wlh, [1.0, 2.0, 3.0])
+    assert box.center.dtype == np.int64
+    assert box.center is not center
+
+
+def test_corners_cache():
+    box = Box(center=[1.0, 2.0, 3.0], size=[2.0, 4.0, 1.5], orientation=Quaternion(axis=[0, 0, 1], angle=0.3))
+    corners = box.corners()
+    expected = corners.copy()
+
+    # Modifying the returned corners must not modify the box.
+    corners[:] = 0
+    assert np.allclose(box.corners(), expected)
+
+    expected = box.corners() + np.array([[1.0], [-1.0], [0.5]])
+    assert np.allclose(box.translate(np.array([1.0, -1.0, 0.5])).corners(), expected)
+
+    # Corners follow direct modifications of the box attributes.
+    box.center = np.array([0.0, 0.0, 0.0])
+    box.orientation = Quaternion()
+    assert np.allclose(box.corners().mean(axis=1), 0)
+    assert np.allclose(box.corners()[:, 0], [2.0, 1.0, 0.75])
+    assert np.allclose(box.corners(wlh_factor=2.0)[:, 0], [4.0, 2.0, 1.5])
+
+
+def write_radar_pcd(file_name, points):
+    fields = (
+        "x y z dyn_prop id rcs vx vy vx_comp vy_comp is_quality_valid ambig_state x_rms y_rms invalid_state pdh0 "
+        "vx_rms vy_rms"
+    )
+    header = [
+        "# .PCD v0.7 - Point Cloud Data file format",
+        "VERSION 0.7",
+        "FIELDS " + fields,
+        "SIZE 4 4 4 1 2 4 4 4 4 4 1 1 1 1 1 1 1 1",
+        "TYPE F F F I I F F F F F I I I I I I I I",
+        "COUNT " + " ".join(["1"] * 18),
+        "WIDTH {}".format(len(points)),
+        "HEIGHT 1",
+        "VIEWPOINT 0 0 0 1 0 0 0",
+        "POINTS {}".format(len(points)),
+        "DATA binary",
+    ]
+    data = b"".join(struct.pack("<fffbhfffffbbbbbbbb", *point) for point in points)
+    file_name.write_bytes(("\n".join(header) + "\n").encode("utf-8") + data + b"\n")
+
+
+def test_radar_from_file(tmp_path):
+    # x, y, z, dyn_prop, id, rcs, vx, vy, vx_comp, vy_comp, is_quality_valid, ambig_state, x_rms, y_rms,
+    # invalid_state, pdh0, vx_rms, vy_rms
+    points = [
+        (1.5, -2.0, 0.5, 0, 1, 3.5, 0.1, 0.2, 0.3, 0.4, 1, 3, 2, 3, 0, 1, 4, 5),
+        (2.5, 1.0, 0.0, 1, 2, -1.5, 0.0, 0.0, 0.0, 0.0, 1, 3, 1, 1, 1, 1, 1, 1),  # Invalid state.
+        (3.5, 4.0, 1.0, 7, 3, 2.0, 0.0, 0.0, 0.0, 0.0, 1, 3, 1, 1, 0, 1, 1, 1),  # Filtered dynProp.
+        (4.5, 0.0, 0.0, 2, 4, 0.5, 1.0, 1.0, 1.0, 1.0, 0, 1, 1, 1, 0, 2, 1, 1),  # Ambiguous.
+        (-5.0, 6.0, 0.0, 6, 300, 7.0, -1.0, 2.0, -3.0, 4.0, 1, 3, 9, 8, 0, 7, 6, 5),
+    ]
+    file_name = tmp_path / "radar.pcd"
+    write_radar_pcd(file_name, points)
+
+    pc = RadarPointCloud.from_file(file_name)
+    assert pc.points.shape == (18, 2)
+    np.testing.assert_allclose(pc.points.T, np.array([points[0], points[4]]), rtol=1e-6)
+
+    pc = RadarPointCloud.from_file(file_name, invalid_states=[0, 1], dynprop_states=range(8), ambig_states=[1, 3])
+    assert pc.points.shape == (18, 5)
+    np.testing.assert_allclose(pc.points.T, np.array(points), rtol=1e-6)
+
+
+def test_radar_from_file_empty(tmp_path):
+    file_name = tmp_path / "radar.pcd"
+    write_radar_pcd(file_name, [(np.nan,) * 3 + (0,) * 2 + (np.nan,) * 5 + (0,) * 8] * 3)
+
+    pc = RadarPointCloud.from_file(file_name)
+    assert pc.points.shape == (18, 0)
+
+
+def test_lidar_from_file(tmp_path):
+    scan = np.arange(30, dtype=np.float32).reshape(6, 5)
+    file_name = tmp_path / "lidar.bin"
+    scan.tofile(str(file_name))
+
+    pc = LidarPointCloud.from_file(file_name)
+    expected = np.fromfile(str(file_name), dtype=np.float32).reshape((-1, 5))[:, :4].T
+
+    # The points are a contiguous copy, not a view of the file.
+    assert pc.points.dtype == np.float32
+    assert pc.points.flags["C_CONTIGUOUS"] and pc.points.flags["OWNDATA"]
+    np.testing.assert_array_equal(pc.points, expected)
+
+
+def test_lidar_from_file_empty(tmp_path):
+    file_name = tmp_path / "lidar.bin"
+    file_name.write_bytes(b"")
+
+    pc = LidarPointCloud.from_file(file_name)
+    assert pc.points.shape == (4, 0)
+
+    # A trailing partial float is ignored.
+    file_name.write_bytes(np.ones(10, dtype=np.float32).tobytes() + b"\x00\x00")
+
+    pc = LidarPointCloud.from_file(file_name)
+    np.testing.assert_array_equal(pc.points, np.ones((4, 2), dtype=np.float32))
+
+
+class StubLyftDataset:
+    """Minimal stand-in for LyftDataset with a chain of lidar sweeps."""
+
+    def __init__(self, data_path, nbr_sweeps):
+        self.data_path = data_path
+        self.tables = {"sample_data": {}, "ego_pose": {}, "calibrated_sensor": {}}
+        rng = np.random.RandomState(0)
+
+        def rotation():
+            # Non-unit quaternion.
+            return list(rng.randn(4) * 2)
+
+        self.tables["calibrated_sensor"]["cs"] = {"translation": [1.0, 0.5, 1.8], "rotation": rotation()}
+        self.tables["calibrated_sensor"]["ref_cs"] = {"translation": [0.2, 0.0, 1.5], "rotation": rotation()}
+        self.tables["ego_pose"]["ref_pose"] = {"translation": [100.0, 200.0, 1.0], "rotation": rotation()}
+        self.tables["sample_data"]["ref"] = {
+            "ego_pose_token": "ref_pose",
+            "calibrated_sensor_token": "ref_cs",
+            "timestamp": 10000000,
+        }
+
+        prev = ""
+        for i in range(nbr_sweeps):
+            file_name = "sweep_{}.bin".format(i)
+            rng.uniform(-5, 5, size=(50 + 10 * i, 5)).astype(np.float32).tofile(str(data_path / file_name))
+            self.tables["ego_pose"]["pose_{}".format(i)] = {
+                "translation": list(np.array([100.0, 200.0, 1.0]) + rng.randn(3)),
+                "rotation": rotation(),
+            }
+            self.tables["sample_data"]["sd_{}".format(i)] = {
+                "filename": file_name,
+                "ego_pose_token": "pose_{}".format(i),
+                "calibrated_sensor_token": "cs",
+                "timestamp": 10000000 - 50000 * (nbr_sweeps - i),
+                "prev": prev,
+            }
+            prev = "sd_{}".format(i)
+
+        self.sample = {"data": {"LIDAR_TOP": prev, "REF": "ref"}}
+
+    def get(self, table_name, token):
+        return self.tables[table_name][token]
+
+
+def multisweep_reference(lyftd, num_sweeps, min_distance):
+    """Aggregates the sweeps with the four homogeneous transformation matrices."""
+    ref_sd_rec = lyftd.get("sample_data", lyftd.sample["data"]["REF"])
+    ref_pose_rec = lyftd.get("ego_pose", ref_sd_rec["ego_pose_token"])
+    ref_cs_rec = lyftd.get("calibrated_sensor", ref_sd_rec["calibrated_sensor_token"])
+    ref_from_car = transform_matrix(ref_cs_rec["translation"], Quaternion(ref_cs_rec["rotation"]), inverse=True)
+    car_from_global = transform_matrix(ref_pose_rec["translation"], Quaternion(ref_pose_rec["rotation"]), inverse=True)
+
+    all_points = np.zeros((4, 0))
+    all_times = np.zeros((1, 0))
+    sd_rec = lyftd.get("sample_data", lyftd.sample["data"]["LIDAR_TOP"])
+    for _ in range(num_sweeps):
+        points = np.fromfile(str(lyftd.data_path / sd_rec["filename"]), dtype=np.float32).reshape(-1, 5)[:, :4].T
+        pose_rec = lyftd.get("ego_pose", sd_rec["ego_pose_token"])
+        cs_rec = lyftd.get("calibrated_sensor", sd_rec["calibrated_sensor_token"])
+        global_from_car = transform_matrix(pose_rec["translation"], Quaternion(pose_rec["rotation"]))
+        car_from_current = transform_matrix(cs_rec["translation"], Quaternion(cs_rec["rotation"]))
+        trans_matrix = ref_from_car.dot(car_from_global).dot(global_from_car).dot(car_from_current)
+
+        points = points.astype(np.float64)
+        points[:3, :] = trans_matrix.dot(np.vstack((points[:3, :], np.ones(points.shape[1]))))[:3, :]
+        close = np.logical_and(np.abs(points[0, :]) < min_distance, np.abs(points[1, :]) < min_distance)
+        points = points[:, np.logical_not(close)]
+
+        time_lag = 1e-6 * (ref_sd_rec["timestamp"] - sd_rec["timestamp"])
+        all_points = np.hstack((all_points, points))
+        all_times = np.hstack((all_times, time_lag * np.ones((1, points.shape[1]))))
+
+        if sd_rec["prev"] == "":
+            break
+        sd_rec = lyftd.get("sample_data", sd_rec["prev"])
+
+    return all_points, all_times
+
+
+@pytest.mark.parametrize("num_sweeps", [0, 1, 3, 10])
+def test_from_file_multisweep(tmp_path, num_sweeps):
+    # 5 sweeps are available, so 10 sweeps stops early at the first sweep without a previous one.
+    lyftd = StubLyftDataset(tmp_path, nbr_sweeps=5)
+    pc, times = LidarPointCloud.from_file_multisweep(
+        lyftd, lyftd.sample, "LIDAR_TOP", "REF", num_sweeps=num_sweeps, min_distance=2.0
+    )
+    expected_points, expected_times = multisweep_reference(lyftd, num_sweeps, min_distance=2.0)
+
+    assert pc.points.shape == expected_points.shape
+    assert pc.points.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(pc.points, expected_points, rtol=1e-5, atol=1e-4)
+    assert times.shape == (1, pc.nbr_points())
+    np.testing.assert_allclose(times, expected_times)
+
+
+@pytest.mark.parametrize("inverse", [False, True])
+def test_cached_transform_matrix(inverse):
+    rng = np.random.RandomState(1)
+    for _ in range(100):
+        # Non-unit quaternions.
+        rotation = tuple(rng.randn(4) * 3)
+        translation = tuple(rng.randn(3) * 100)
+
+        tm = _cached_transform_matrix(translation, rotation, inverse)
+        expected = transform_matrix(translation, Quaternion(rotation), inverse=inverse)
+        np.testing.assert_allclose(tm, expected, atol=1e-10)
+        assert not tm.flags.writeable
+
+
+def random_lidar_points(nbr_points=100):
+    return np.random.RandomState(2).uniform(-5, 5, size=(4, nbr_points)).astype(np.float32)
+
+
+def test_translate():
+    points = random_lidar_points()
+    for x in (np.array([1.0, -2.0, 0.5]), [1.0, -2.0, 0.5], np.array([[1.0], [-2.0], [0.5]])):
+        pc = LidarPointCloud(points.copy())
+        pc.translate(x)
+
+        expected = points.copy()
+        for i in range(3):
+            expected[i, :] = expected[i, :] + np.ravel(x)[i]
+
+        assert pc.points.dtype == np.float32
+        np.testing.assert_allclose(pc.points, expected, rtol=1e-6)
+
+
+def test_transform():
+    points = random_lidar_points()
+    trans_matrix = transform_matrix([10.0, -3.0, 1.5], Quaternion(axis=[0.2, 0.3, 1.0], angle=0.7))
+
+    pc = LidarPointCloud(points.copy())
+    pc.transform(trans_matrix)
+
+    expected = points.copy()
+    expected[:3, :] = trans_matrix.dot(np.vstack((points[:3, :], np.ones(points.shape[1]))))[:3, :]
+
+    assert pc.points.dtype == np.float32
+    np.testing.assert_allclose(pc.points, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_remove_close():
+    points = random_lidar_points()
+    # Points with NaN coordinates are kept.
+    points[0, 0] = np.nan
+    points[:2, 1] = np.nan
+
+    pc = LidarPointCloud(points.copy())
+    pc.remove_close(2.0)
+
+    close = np.logical_and(np.abs(points[0, :]) < 2.0, np.abs(points[1, :]) < 2.0)
+    expected = points[:, np.logical_not(close)]
+
+    assert 0 < pc.nbr_points() < points.shape[1]
+    assert pc.points.dtype == np.float32
+    np.testing.assert_array_equal(pc.points, expected)
+    assert np.isnan(pc.points[0, 0]) and np.isnan(pc.points[1, 1])
+
+
+def make_render_box():
+    return Box(center=[1.0, -0.5, 15.0], size=[2.0, 4.0, 1.5], orientation=Quaternion(axis=[0, 1, 0], angle=0.4))
+
+
+def test_render_cv2():
+    box = make_render_box()
+    intrinsic = np.array([[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]])
+    colors = ((0, 0, 255), (255, 0, 0), (155, 155, 155))
+
+    image = np.zeros((720, 1280, 3), dtype=np.uint8)
+    box.render_cv2(image, view=intrinsic, normalize=True, colors=colors, linewidth=2)
+
+    # Reference drawing with one cv2.line call per edge.
+    corners = view_points(box.corners(), intrinsic, normalize=True)[:2, :].T
+    expected = np.zeros_like(image)
+
+    def line(start, end, color):
+        cv2.line(expected, (int(start[0]), int(start[1])), (int(end[0]), int(end[1])), color[::-1], 2)
+
+    for i in range(4):
+        line(corners[i], corners[i + 4], colors[2])
+    for selected_corners, color in [(corners[:4], colors[0]), (corners[4:], colors[1])]:
+        for i in range(4):
+            line(selected_corners[i - 1], selected_corners[i], color)
+    line(np.mean(corners[[2, 3, 7, 6]], axis=0), np.mean(corners[2:4], axis=0), colors[0])
+
+    assert image.any()
+    np.testing.assert_array_equal(image, expected)
+
+
+@pytest.mark.parametrize("colors", [("b", "r", "k"), (np.array([0.1, 0.5, 0.2]),) * 3])
+def test_render(colors):
+    box = make_render_box()
+    axis = Figure().add_subplot(1, 1, 1)
+    box.render(axis, view=np.eye(4), colors=colors, linewidth=3)
+
+    assert len(axis.collections) == 1
+    collection = axis.collections[0]
+    assert isinstance(collection, LineCollection)
+
+    segments = collection.get_segments()
+    assert len(segments) == 13
+    expected_colors = to_rgba_array([colors[2]] * 4 + [colors[0]] * 4 + [colors[1]] * 4 + [colors[0]])
+    np.testing.assert_allclose(collection.get_colors(), expected_colors)
+    np.testing.assert_allclose(collection.get_linewidths(), [3])
+
+    # The sides connect the front and rear corners, the last segment indicates the front.
+    corners = box.corners()[:2, :].T
+    for i in range(4):
+        np.testing.assert_allclose(segments[i], corners[[i, i + 4]])
+    np.testing.assert_allclose(segments[12], [np.mean(corners[[2, 3, 7, 6]], axis=0), np.mean(corners[2:4], axis=0)])
+
+    # The axis limits cover the box.
+    assert axis.get_xlim()[0] <= corners[:, 0].min() and axis.get_xlim()[1] >= corners[:, 0].max()
+    assert axis.get_ylim()[0] <= corners[:, 1].min() and axis.get_ylim()[1] >= corners[:, 1].max()
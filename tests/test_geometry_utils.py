@@ -8,7 +8,7 @@ import numpy as np
 from pyquaternion import Quaternion
 
 from lyft_dataset_sdk.utils.data_classes import Box
-from lyft_dataset_sdk.utils.geometry_utils import points_in_box, quaternion_yaw
+from lyft_dataset_sdk.utils.geometry_utils import points_in_box, quaternion_yaw, view_points
 
 
 class TestGeometryUtils(unittest.TestCase):
@@ -109,6 +109,27 @@ class TestGeometryUtils(unittest.TestCase):
             self.assertEqual(mask[0], True)
             self.assertEqual(mask[1], False)
 
+    def test_view_points(self):
+        """Test view_points() against the projection in homogeneous coordinates."""
+
+        points = np.array([[1.0, -2.0, 4.0], [0.5, 3.0, 10.0], [-7.0, 0.0, 2.5]]).transpose()
+        original = points.copy()
+        homogeneous = np.vstack((points, np.ones((1, points.shape[1]))))
+
+        intrinsic = np.array([[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]])
+        view_3x4 = np.hstack((intrinsic, np.array([[1.0], [2.0], [3.0]])))
+        view_4x4 = np.vstack((view_3x4, [0.0, 0.0, 0.0, 1.0]))
+
+        for view in [intrinsic, view_3x4, view_4x4]:
+            viewpad = np.eye(4)
+            viewpad[: view.shape[0], : view.shape[1]] = view
+            expected = np.dot(viewpad, homogeneous)[:3, :]
+            np.testing.assert_allclose(view_points(points, view, normalize=False), expected)
+            np.testing.assert_allclose(view_points(points, view, normalize=True), expected / expected[2, :])
+
+        # The input points are not modified.
+        np.testing.assert_array_equal(points, original)
+
 
 if __name__ == "__main__":
     unittest.main()